@@ -1,31 +1,32 @@
 from pathlib import Path
-import pdfplumber
-import json
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+import numpy as np
+import pymupdf
+import orjson
 import re
 import os
 import unicodedata
 import warnings
-import logging
-import sys
-from contextlib import redirect_stderr
-from io import StringIO
-from jsonschema import validate
+import fastjsonschema
 
-# Suppress pdfplumber warnings and logging messages
+# Suppress library warnings
 warnings.filterwarnings("ignore")
-logging.getLogger("pdfplumber").setLevel(logging.ERROR)
+pymupdf.TOOLS.mupdf_display_errors(False)
 
 # Configuration constants to reduce hardcoding
 CONFIG = {
     "font_analysis": {
-        "max_font_levels": 3,  # Number of font sizes to consider for headings
-        "char_proximity_threshold": 2,  # How close characters need to be to group as one text run
-        "sample_runs_for_language": 50  # Number of text runs to sample for language detection
+        "max_font_levels": 3  # Number of font sizes to consider for headings
     },
     "text_validation": {
         "min_meaningful_chars": 2,
         "min_text_length": 2
     },
+    "scan_detection": {
+        "probe_pages": 3  # Leading image-only pages after which a PDF is treated as scanned
+    },
     "language_patterns": {
         "japanese": {
             "patterns": [r'第\d+[章節条項部編]', r'[一二三四五六七八九十]\s*[章節条項部編]'],
@@ -48,6 +49,61 @@ CONFIG = {
     ]
 }
 
+# Settings read on every text run, bound once to skip nested dict lookups
+LANGUAGE_PATTERNS = CONFIG["language_patterns"]
+MIN_TEXT_LENGTH = CONFIG["text_validation"]["min_text_length"]
+MIN_MEANINGFUL_CHARS = CONFIG["text_validation"]["min_meaningful_chars"]
+SCAN_PROBE_PAGES = CONFIG["scan_detection"]["probe_pages"]
+LETTER_CATEGORIES = frozenset(['Lu', 'Ll', 'Lt', 'Lo', 'Lm'])
+NUMBER_CATEGORIES = frozenset(['Nd', 'Nl', 'No'])
+
+def build_heading_pattern(lang_patterns):
+    """Fuse universal and language-specific patterns into one alternation.
+
+    Universal patterns are tried first and keep their case-insensitive flag,
+    so the named group that matched tells which kind of pattern hit.
+    """
+    alternation = "(?P<u>" + "|".join(f"(?i:{p})" for p in CONFIG["universal_patterns"]) + ")"
+    if lang_patterns:
+        alternation += "|(?P<lang>" + "|".join(f"(?:{p})" for p in lang_patterns) + ")"
+    return re.compile(alternation)
+
+# Pre-compiled regexes used while scoring every text run
+HEADING_PATTERN = {
+    lang: build_heading_pattern(cfg.get("patterns", []))
+    for lang, cfg in LANGUAGE_PATTERNS.items()
+}
+
+# Unicode blocks for script detection as (first, last, script), sorted by codepoint
+SCRIPT_RANGES = [
+    (0x0900, 0x097F, "hindi"),     # Devanagari
+    (0x2E80, 0x2EFF, "japanese"),  # CJK Radicals Supplement
+    (0x3040, 0x30FF, "japanese"),  # Hiragana, Katakana
+    (0x31C0, 0x31FF, "japanese"),  # CJK Strokes, Katakana Phonetic Extensions
+    (0x32D0, 0x32FF, "japanese"),  # Circled Katakana
+    (0x3400, 0x4DBF, "japanese"),  # CJK Unified Ideographs Extension A
+    (0x4E00, 0x9FFF, "japanese"),  # CJK Unified Ideographs
+    (0xA8E0, 0xA8FF, "hindi"),     # Devanagari Extended
+    (0xF900, 0xFAFF, "japanese"),  # CJK Compatibility Ideographs
+    (0xFF66, 0xFF9F, "japanese"),  # Halfwidth Katakana
+    (0x1AFF0, 0x1B16F, "japanese"),  # Kana Extended and Supplement
+    (0x1F200, 0x1F2FF, "japanese"),  # Enclosed Ideographic Supplement
+    (0x20000, 0x3FFFF, "japanese"),  # CJK Unified Ideographs Extensions B+
+]
+SCRIPT_RANGE_STARTS = [first for first, _, _ in SCRIPT_RANGES]
+
+ENGLISH_KEYWORD_RE = re.compile(
+    "|".join(re.escape(kw) for kw in LANGUAGE_PATTERNS["english"]["keywords"])
+)
+CHAPTER_RE = re.compile(r'(chapter|chapter\s+\d+|第\d+章|अध्याय)')
+SECTION_RE = re.compile(r'(\d+\.\d+|\d+\.\d+\.\d+|section)')
+SUBSECTION_RE = re.compile(r'(\d+\.\d+\.\d+)')
+NUMBERED_SECTION_RE = re.compile(r'(\d+\.\d+)')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Text-only extraction: image blocks are never decoded into the page dict
+TEXT_FLAGS = pymupdf.TEXTFLAGS_TEXT
+
 # Load the required JSON schema
 # Check if running in Docker or local development
 if os.environ.get('DOCKER_ENV') or (Path("/app").exists() and not Path(__file__).parent.name == "Challenge_1a"):
@@ -57,13 +113,13 @@ else:
     # Local development environment
     schema_path = Path(__file__).parent / "sample_dataset" / "schema" / "output_schema.json"
 
-with open(schema_path) as f:
-    OUTPUT_SCHEMA = json.load(f)
+OUTPUT_SCHEMA = orjson.loads(schema_path.read_bytes())
+VALIDATE_OUTPUT = fastjsonschema.compile(OUTPUT_SCHEMA)
 
 def is_meaningful_text(text, min_length=None):
     """Check if text is meaningful for heading detection across languages."""
     if min_length is None:
-        min_length = CONFIG["text_validation"]["min_text_length"]
+        min_length = MIN_TEXT_LENGTH
     
     if not text or len(text.strip()) < min_length:
         return False
@@ -71,91 +127,114 @@ def is_meaningful_text(text, min_length=None):
     # Remove whitespace
     text = text.strip()
     
+    # ASCII fast path: letters and digits are exactly the alphanumerics
+    if text.isascii():
+        return sum(map(str.isalnum, text)) >= MIN_MEANINGFUL_CHARS
+    
     # Check if text contains meaningful characters (not just punctuation/numbers)
     meaningful_chars = 0
     for char in text:
-        if unicodedata.category(char) in ['Lu', 'Ll', 'Lt', 'Lo', 'Lm']:  # Letter categories
+        category = unicodedata.category(char)
+        if category in LETTER_CATEGORIES:  # Letter categories
             meaningful_chars += 1
-        elif unicodedata.category(char) in ['Nd', 'Nl', 'No']:  # Number categories
+        elif category in NUMBER_CATEGORIES:  # Number categories
             meaningful_chars += 1
     
     # Should have at least minimum meaningful characters
-    return meaningful_chars >= CONFIG["text_validation"]["min_meaningful_chars"]
+    return meaningful_chars >= MIN_MEANINGFUL_CHARS
 
 def clean_text(text):
-    """Clean and normalize text for different languages."""
+    """Clean and normalize text for different languages, returning (cleaned, lowered)."""
     if not text:
-        return ""
+        return "", ""
     
     # Normalize unicode characters
     text = unicodedata.normalize('NFKC', text)
     
     # Remove extra whitespace but preserve structure
-    text = re.sub(r'\s+', ' ', text.strip())
+    text = WHITESPACE_RE.sub(' ', text.strip())
     
-    return text
+    return text, text.lower()
 
 def detect_language_script(text):
     """Detect the primary script/language family of the text."""
     if not text:
         return "english"  # Default to english
     
-    script_counts = {'english': 0, 'japanese': 0, 'hindi': 0}
-    
-    for char in text:
-        if char.isspace() or unicodedata.category(char).startswith('P'):  # Punctuation
-            continue
-            
-        try:
-            char_name = unicodedata.name(char, '')
-            
-            # Check for specific target languages
-            if any(keyword in char_name for keyword in ['CJK', 'HIRAGANA', 'KATAKANA']):
-                script_counts['japanese'] += 1
-            elif any(keyword in char_name for keyword in ['DEVANAGARI']):
-                script_counts['hindi'] += 1
-            elif any(keyword in char_name for keyword in ['LATIN']):
-                script_counts['english'] += 1
-            elif unicodedata.category(char).startswith('L'):  # Any other letter
-                script_counts['english'] += 1  # Default to english for unknown letters
-        except:
-            script_counts['english'] += 1  # Default for any errors
+    script_counts = count_scripts(text)
     
     # Return the most common script, with english as fallback
     max_script = max(script_counts, key=script_counts.get)
     return max_script if script_counts[max_script] > 0 else 'english'
 
-def calculate_heading_confidence(text, font_size=None, position_info=None, context=None):
+def count_scripts(text):
+    """Count letters per script using the Unicode block ranges."""
+    script_counts = {'english': 0, 'japanese': 0, 'hindi': 0}
+    
+    for char in text:
+        cp = ord(char)
+        if cp < 0x80:  # ASCII: only letters count
+            if char.isalpha():
+                script_counts['english'] += 1
+            continue
+        
+        # Look up the Unicode block by codepoint range
+        idx = bisect_right(SCRIPT_RANGE_STARTS, cp) - 1
+        if idx >= 0 and cp <= SCRIPT_RANGES[idx][1]:
+            script_counts[SCRIPT_RANGES[idx][2]] += 1
+        elif unicodedata.category(char).startswith('L'):  # Any other letter
+            script_counts['english'] += 1  # Default to english for unknown letters
+    
+    return script_counts
+
+def calculate_heading_confidence(text, font_size=None, position_info=None, context=None, text_lower=None):
     """Calculate confidence score for text being a heading using multiple factors."""
-    confidence = 0.0
     text_clean = text.strip()
     
     if not text_clean:
         return 0.0
     
+    if text_lower is None:
+        text_lower = text_clean.lower()
+    
+    # Factors 1-3 depend only on the text, so repeated headers/footers hit the cache
+    confidence = calculate_text_confidence(text_clean, text_lower)
+    
+    # Factor 4: Font size relative importance (10% weight)
+    font_score = 0.0
+    if font_size and context and "font_percentiles" in context:
+        percentiles = context["font_percentiles"]
+        if font_size >= percentiles.get("90th", 0):
+            font_score = 1.0  # Top 10% of font sizes
+        elif font_size >= percentiles.get("75th", 0):
+            font_score = 0.7  # Top 25% of font sizes
+        elif font_size >= percentiles.get("50th", 0):
+            font_score = 0.4  # Above median
+        else:
+            font_score = 0.1  # Below median - less likely heading
+    
+    confidence += font_score * 0.1
+    
+    return min(confidence, 1.0)  # Cap at 1.0
+
+@lru_cache(maxsize=4096)
+def calculate_text_confidence(text_clean, text_lower):
+    """Calculate the pattern, format and length part of the heading confidence."""
+    confidence = 0.0
+    
     # Factor 1: Pattern-based scoring (40% weight)
     pattern_score = 0.0
     
-    # Universal numbering patterns
-    for pattern in CONFIG["universal_patterns"]:
-        if re.search(pattern, text_clean, re.IGNORECASE):
-            pattern_score = 1.0
-            break
-    
-    # Language-specific patterns
+    # Universal numbering patterns and language-specific patterns in one search
     script_type = detect_language_script(text_clean)
-    lang_config = CONFIG["language_patterns"].get(script_type, CONFIG["language_patterns"]["english"])
-    
-    if script_type in ["japanese", "hindi"]:
-        patterns = lang_config.get("patterns", [])
-        for pattern in patterns:
-            if re.search(pattern, text_clean):
-                pattern_score = max(pattern_score, 0.9)
-                break
-    else:  # English
-        keywords = lang_config.get("keywords", [])
-        text_lower = text_clean.lower()
-        if any(keyword in text_lower for keyword in keywords):
+    lang_config = LANGUAGE_PATTERNS.get(script_type, LANGUAGE_PATTERNS["english"])
+    
+    match = HEADING_PATTERN[script_type].search(text_clean)
+    if match:
+        pattern_score = 1.0 if match.group("u") is not None else 0.9
+    
+    if script_type not in ["japanese", "hindi"]:  # English
+        if ENGLISH_KEYWORD_RE.search(text_lower):
             pattern_score = max(pattern_score, 0.8)
     
     confidence += pattern_score * 0.4
@@ -194,22 +273,7 @@ def calculate_heading_confidence(text, font_size=None, position_info=None, conte
     
     confidence += length_score * 0.2
     
-    # Factor 4: Font size relative importance (10% weight)
-    font_score = 0.0
-    if font_size and context and "font_percentiles" in context:
-        percentiles = context["font_percentiles"]
-        if font_size >= percentiles.get("90th", 0):
-            font_score = 1.0  # Top 10% of font sizes
-        elif font_size >= percentiles.get("75th", 0):
-            font_score = 0.7  # Top 25% of font sizes
-        elif font_size >= percentiles.get("50th", 0):
-            font_score = 0.4  # Above median
-        else:
-            font_score = 0.1  # Below median - less likely heading
-    
-    confidence += font_score * 0.1
-    
-    return min(confidence, 1.0)  # Cap at 1.0
+    return confidence
 
 def determine_heading_level(confidence, text, context=None):
     """Determine heading level based on confidence and additional context."""
@@ -217,18 +281,18 @@ def determine_heading_level(confidence, text, context=None):
     # High confidence patterns get priority
     if confidence >= 0.8:
         # Check for chapter/major section patterns
-        if re.search(r'(chapter|chapter\s+\d+|第\d+章|अध्याय)', text.lower()):
+        if CHAPTER_RE.search(text.lower()):
             return "H1"
-        elif re.search(r'(\d+\.\d+|\d+\.\d+\.\d+|section)', text.lower()):
+        elif SECTION_RE.search(text.lower()):
             return "H2"
         else:
             return "H1"  # Default high confidence to H1
     
     elif confidence >= 0.6:
         # Medium confidence - usually H2 or H3
-        if re.search(r'(\d+\.\d+\.\d+)', text):
+        if SUBSECTION_RE.search(text):
             return "H3"
-        elif re.search(r'(\d+\.\d+)', text):
+        elif NUMBERED_SECTION_RE.search(text):
             return "H2"
         else:
             return "H2"  # Default medium confidence to H2
@@ -241,144 +305,131 @@ def determine_heading_level(confidence, text, context=None):
         # Below threshold - not a heading
         return None
 
+def iter_page_spans(pdf):
+    """Yield (page_num, spans) for each text page, with spans as (text, size) pairs."""
+    image_only_pages = 0
+    for page_num, page in enumerate(pdf, start=1):
+        # A page without fonts has no text (e.g. a scanned image), so skip extraction
+        if not page.get_fonts():
+            if page_num == image_only_pages + 1 and page.get_images():
+                image_only_pages += 1
+                if image_only_pages >= SCAN_PROBE_PAGES:
+                    return  # Scanned document: nothing to outline
+            continue
+        
+        # PyMuPDF already groups characters into spans of uniform font and size
+        page_dict = page.get_text("dict", flags=TEXT_FLAGS)
+        yield page_num, [
+            (span["text"], span["size"])
+            for block in page_dict["blocks"]
+            for line in block.get("lines", [])
+            for span in line["spans"]
+        ]
+
 def extract_outline(pdf_path):
     outline = []
     font_stats = {}  # Font size => count of usage
     title_text = ""
-    all_text_runs = []  # Store all text runs for language detection
-    
-    # First pass: collect font statistics for context
-    with redirect_stderr(StringIO()):  # Suppress CropBox warnings
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, start=1):
-                chars = page.chars
-                for char in chars:
-                    # Skip characters that don't have size information
-                    if "size" not in char:
-                        continue
-                    size = round(char["size"], 1)
-                    font_stats[size] = font_stats.get(size, 0) + 1
+    # Possible headings are stored as parallel arrays (one entry per run)
+    run_texts = []
+    run_lowered = []
+    run_sizes = []
+    run_pages = []
+    
+    # Pages are streamed once: font statistics cover every span, but only runs
+    # that can still reach the heading threshold are kept. The font factor is
+    # unknown until all pages are seen and adds at most 0.1 to the confidence.
+    min_length = max(MIN_TEXT_LENGTH, MIN_MEANINGFUL_CHARS)
+    # MuPDF keeps every message in a process-wide list, so only hold one document's worth
+    pymupdf.TOOLS.reset_mupdf_warnings()
+    with pymupdf.open(pdf_path) as pdf:
+        for page_num, spans in iter_page_spans(pdf):
+            for text, size in spans:
+                if not text:
+                    continue
+                size = round(size, 1)
+                # Weight by character count to keep per-character statistics
+                font_stats[size] = font_stats.get(size, 0) + len(text)
 
-    # Step 2: Extract text runs and detect language
-    with redirect_stderr(StringIO()):  # Suppress CropBox warnings
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, start=1):
-                # Group characters into words by position and font size
-                text_runs = []
-                current_run = {"text": "", "size": None, "x0": None, "x1": None}
-                
-                chars = page.chars
-                for char in chars:
-                    if "size" not in char:
-                        continue
-                        
-                    size = round(char["size"], 1)
-                    text = char.get("text", "")
-                    x0 = char.get("x0", 0)
-                    x1 = char.get("x1", 0)
-                    
-                    # If this character continues the current run (same size and close position)
-                    proximity_threshold = CONFIG["font_analysis"]["char_proximity_threshold"]
-                    if (current_run["size"] == size and current_run["x1"] is not None and 
-                        abs(x0 - current_run["x1"]) < proximity_threshold):  # Characters very close together
-                        current_run["text"] += text
-                        current_run["x1"] = x1
-                    else:
-                        # Save previous run if it has content
-                        if current_run["text"].strip():
-                            cleaned_text = clean_text(current_run["text"])
-                            if cleaned_text:
-                                text_runs.append({
-                                    "text": cleaned_text,
-                                    "size": current_run["size"],
-                                    "page": page_num
-                                })
-                        
-                        # Start new run
-                        current_run = {
-                            "text": text,
-                            "size": size,
-                            "x0": x0,
-                            "x1": x1
-                        }
+                if not text.strip():
+                    continue
+                cleaned_text, lowered_text = clean_text(text)
+                if not cleaned_text:
+                    continue
+                # Runs are already stripped, so the length check comes first
+                if len(cleaned_text) < min_length or not is_meaningful_text(cleaned_text):
+                    continue
+                if calculate_text_confidence(cleaned_text, lowered_text) + 0.1 < 0.4:
+                    continue
                 
-                # Don't forget the last run
-                if current_run["text"].strip():
-                    cleaned_text = clean_text(current_run["text"])
-                    if cleaned_text:
-                        text_runs.append({
-                            "text": cleaned_text,
-                            "size": current_run["size"],
-                            "page": page_num
-                        })
-                
-                all_text_runs.extend(text_runs)
-    
-    # Detect the primary language/script of the document
-    sample_size = CONFIG["font_analysis"]["sample_runs_for_language"]
-    all_text = " ".join([run["text"] for run in all_text_runs[:sample_size]])  # Sample first N runs
-    primary_script = detect_language_script(all_text)
+                run_texts.append(cleaned_text)
+                run_lowered.append(lowered_text)
+                run_sizes.append(size)
+                run_pages.append(page_num)
     
-    # Calculate font size percentiles for context
-    all_sizes = []
-    for size, count in font_stats.items():
-        all_sizes.extend([size] * count)
+    sizes = np.array(run_sizes, dtype=np.float64)
+    pages = np.array(run_pages, dtype=np.int32)
     
+    # Calculate font size percentiles for context, weighting each distinct size by its count
     font_percentiles = {}
-    if all_sizes:
-        all_sizes.sort()
+    if font_stats:
+        stat_sizes = np.fromiter(font_stats.keys(), dtype=np.float64, count=len(font_stats))
+        stat_counts = np.fromiter(font_stats.values(), dtype=np.int64, count=len(font_stats))
+        order = np.argsort(stat_sizes)
+        stat_sizes, cumulative = stat_sizes[order], np.cumsum(stat_counts[order])
+        total = int(cumulative[-1])
+        
+        def size_at(position):
+            # Size at this index of the sorted per-character size list
+            return float(stat_sizes[np.searchsorted(cumulative, position, side="right")])
+        
         font_percentiles = {
-            "50th": all_sizes[len(all_sizes) // 2] if all_sizes else 0,
-            "75th": all_sizes[int(len(all_sizes) * 0.75)] if all_sizes else 0,
-            "90th": all_sizes[int(len(all_sizes) * 0.90)] if all_sizes else 0,
+            "50th": size_at(total // 2),
+            "75th": size_at(int(total * 0.75)),
+            "90th": size_at(int(total * 0.90)),
         }
     
     context = {"font_percentiles": font_percentiles}
     
-    # Step 3: Analyze each text run for heading likelihood using confidence scoring
-    heading_candidates = []
-    for run in all_text_runs:
-        if not is_meaningful_text(run["text"]):
-            continue
-            
-        confidence = calculate_heading_confidence(
-            text=run["text"],
-            font_size=run["size"],
-            context=context
+    # Step 3: Analyze each kept text run for heading likelihood using confidence scoring
+    confidences = np.zeros(len(run_texts), dtype=np.float64)
+    for idx in range(len(run_texts)):
+        confidences[idx] = calculate_heading_confidence(
+            text=run_texts[idx],
+            font_size=sizes[idx],
+            context=context,
+            text_lower=run_lowered[idx]
         )
-        
-        # Use confidence threshold instead of binary classification
-        if confidence >= 0.4:  # Adjustable threshold
-            level = determine_heading_level(confidence, run["text"], context)
-            if level:
-                heading_candidates.append({
-                    "text": run["text"],
-                    "level": level,
-                    "page": run["page"],
-                    "confidence": confidence,
-                    "size": run["size"]
-                })
+    
+    # Use confidence threshold instead of binary classification
+    candidates = np.flatnonzero(confidences >= 0.4)  # Adjustable threshold
     
     # Step 4: Post-process and finalize headings
-    # Sort by confidence and remove duplicates/overlaps
-    heading_candidates.sort(key=lambda x: -x["confidence"])
+    # Sort by confidence (stable, so ties keep document order) and remove duplicates/overlaps
+    candidates = candidates[np.argsort(-confidences[candidates], kind="stable")]
     
     seen_texts = set()
-    for candidate in heading_candidates:
-        # Skip near-duplicates
-        text_normalized = re.sub(r'\s+', ' ', candidate["text"].lower().strip())
+    for idx in candidates.tolist():
+        text = run_texts[idx]
+        confidence = float(confidences[idx])
+        level = determine_heading_level(confidence, text, context)
+        if not level:
+            continue
+        
+        # Skip near-duplicates (clean_text already collapsed whitespace and lowercased)
+        text_normalized = run_lowered[idx]
         if text_normalized in seen_texts:
             continue
         seen_texts.add(text_normalized)
         
         # Set title from first high-confidence H1
-        if not title_text and candidate["level"] == "H1" and candidate["confidence"] >= 0.7:
-            title_text = candidate["text"]
+        if not title_text and level == "H1" and confidence >= 0.7:
+            title_text = text
         
         outline.append({
-            "level": candidate["level"],
-            "text": candidate["text"],
-            "page": candidate["page"]
+            "level": level,
+            "text": text,
+            "page": int(pages[idx])
         })
 
     # Step 4: Build JSON with fallback title
@@ -401,23 +452,34 @@ def process_pdfs():
     
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    for pdf_file in input_dir.glob("*.pdf"):
-        print(f"Processing {pdf_file.name}...")
-        result = extract_outline(pdf_file)
+    pdf_files = list(input_dir.glob("*.pdf"))
+    if not pdf_files:
+        return
 
-        # Validate JSON
-        try:
-            validate(instance=result, schema=OUTPUT_SCHEMA)
-        except Exception as e:
-            print(f"Schema validation error for {pdf_file.name}: {e}")
-            continue
+    # Each PDF is parsed independently, so extraction runs in worker processes;
+    # validation and writing stay in the main process.
+    with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, len(pdf_files))) as executor:
+        futures = {}
+        for pdf_file in pdf_files:
+            print(f"Processing {pdf_file.name}...")
+            futures[executor.submit(extract_outline, pdf_file)] = pdf_file
+
+        for future in as_completed(futures):
+            pdf_file = futures[future]
+            result = future.result()
+
+            # Validate JSON
+            try:
+                VALIDATE_OUTPUT(result)
+            except fastjsonschema.JsonSchemaException as e:
+                print(f"Schema validation error for {pdf_file.name}: {e}")
+                continue
 
-        # Save output
-        output_path = output_dir / f"{pdf_file.stem}.json"
-        with open(output_path, "w") as f:
-            json.dump(result, f, indent=2)
+            # Save output
+            output_path = output_dir / f"{pdf_file.stem}.json"
+            output_path.write_bytes(orjson.dumps(result, option=orjson.OPT_INDENT_2))
 
-        print(f"✓ Done: {output_path.name}")
+            print(f"✓ Done: {output_path.name}")
 
 if __name__ == "__main__":
     process_pdfs()
@@ -1,27 +1,49 @@
 
 
 from pathlib import Path
-import pdfplumber
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import numpy as np
+import pymupdf
+import hashlib
 import json
 import os
-import re
-import unicodedata
+import sys
 from datetime import datetime
 
-# Try to import sklearn, install if missing
+# orjson is faster for reading inputs and writing outputs; fall back to stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def load_json(data):
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def dump_json(obj):
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+# Try to import sklearn; a missing install is handled by ensure_sklearn() in the main process
 try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+    from sklearn.pipeline import make_pipeline
 except ImportError:
+    HashingVectorizer = TfidfTransformer = make_pipeline = None
+
+def ensure_sklearn():
+    """Install scikit-learn if missing; only run from __main__ so pool workers never start pip."""
+    global HashingVectorizer, TfidfTransformer, make_pipeline
+    if make_pipeline is not None:
+        return
     print("Installing required scikit-learn...")
     import subprocess
-    import sys
     subprocess.check_call([sys.executable, "-m", "pip", "install", "scikit-learn"])
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+    from sklearn.pipeline import make_pipeline
 
 # Dynamic path detection for local vs Docker environment
-import sys
 
 print(f"Environment check:")
 print(f"  DOCKER_ENV: {os.environ.get('DOCKER_ENV')}")
@@ -40,57 +62,183 @@ print(f"Current working directory: {Path.cwd()}")
 print(f"Using BASE_DIR: {BASE_DIR}")
 print(f"BASE_DIR exists: {BASE_DIR.exists()}")
 
-def extract_outline_and_paragraphs(pdf_path):
-    print(f"  Extracting from: {pdf_path}")
-    sections = []
+# Extracted sections per PDF, kept inside each collection folder (mounted in Docker) and keyed by
+# path, mtime, size and extractor settings, so unchanged PDFs are not re-parsed
+SECTION_CACHE_SUBDIR = Path(".cache") / "sections"
+
+# Bump when the extraction or line filter changes in a way the cache key does not capture
+SECTION_CACHE_VERSION = 1
+
+# Pages per extraction task, so large PDFs are spread across workers
+PAGES_PER_TASK = 10
+
+# Number of ranked sections written to each output
+TOP_K = 5
+
+# A line becomes a section when it is this long and starts with an uppercase letter
+MIN_SECTION_LENGTH = 5
+
+# Plain text mode without layout reconstruction, images or text sorting
+TEXT_FLAGS = pymupdf.TEXTFLAGS_TEXT
+
+def make_vectorizer():
+    """TF-IDF over hashed token counts, so no vocabulary dict is built."""
+    return make_pipeline(
+        HashingVectorizer(n_features=2**18, alternate_sign=False, norm=None, dtype=np.float32),
+        TfidfTransformer(sublinear_tf=True)
+    )
+
+def section_cache_path(cache_dir, pdf_path):
+    stat = pdf_path.stat()
+    key = (f"{SECTION_CACHE_VERSION}:{pymupdf.VersionBind}:{MIN_SECTION_LENGTH}:{TEXT_FLAGS}:"
+           f"{pdf_path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}")
+    return cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+def load_cached_sections(cache_dir, pdf_path):
+    """Return the cached sections of an unchanged PDF, or None on a miss."""
+    try:
+        cached = load_json(section_cache_path(cache_dir, pdf_path).read_bytes())
+    except (OSError, ValueError):
+        return None
+    # Anything that is not the parallel-lists shape of empty_sections() is a miss
+    if not isinstance(cached, dict) or cached.keys() != empty_sections().keys():
+        return None
+    if not all(isinstance(values, list) for values in cached.values()):
+        return None
+    if len({len(values) for values in cached.values()}) != 1:
+        return None
+    return cached
+
+def save_cached_sections(cache_dir, pdf_path, sections):
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, start=1):
-                text = page.extract_text()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        section_cache_path(cache_dir, pdf_path).write_bytes(dump_json(sections))
+    except OSError as e:
+        print(f"  Could not cache sections for {pdf_path.name}: {e}")
+
+def prune_section_cache(cache_dir, pdf_paths):
+    """Delete cache entries that no current PDF maps to (edited or removed PDFs)."""
+    if not cache_dir.is_dir():
+        return
+    try:
+        current = {section_cache_path(cache_dir, pdf_path).name for pdf_path in pdf_paths}
+        for entry in cache_dir.glob("*.json"):
+            if entry.name not in current:
+                entry.unlink()
+    except OSError as e:
+        print(f"  Could not prune section cache {cache_dir}: {e}")
+
+def split_page_ranges(pdf_paths):
+    """Split PDFs into (pdf_path, start, stop) page batches for parallel extraction."""
+    tasks = []
+    for pdf_path in pdf_paths:
+        try:
+            with pymupdf.open(pdf_path) as pdf:
+                page_count = pdf.page_count
+        except Exception as e:
+            print(f"  Error opening {pdf_path}: {e}")
+            continue
+        for start in range(0, page_count, PAGES_PER_TASK):
+            tasks.append((pdf_path, start, min(start + PAGES_PER_TASK, page_count)))
+    return tasks
+
+def empty_sections():
+    """Sections as parallel lists; a line serves as both section title and text."""
+    return {"documents": [], "page_numbers": [], "texts": []}
+
+def extract_outline_and_paragraphs(pdf_path, start=0, stop=None):
+    sections = empty_sections()
+    documents, page_numbers, texts = sections["documents"], sections["page_numbers"], sections["texts"]
+    try:
+        with pymupdf.open(pdf_path) as pdf:
+            if stop is None:
+                stop = pdf.page_count
+            print(f"  Extracting from: {pdf_path} (pages {start + 1}-{stop})")
+            document = pdf_path.name
+            for page_num in range(start + 1, stop + 1):
+                text = pdf[page_num - 1].get_text("text", flags=TEXT_FLAGS, sort=False)
                 if not text:
                     continue
                 lines = text.split("\n")
                 for line in lines:
                     line_clean = line.strip()
-                    if len(line_clean) >= 5 and line_clean[0].isupper():
-                        sections.append({
-                            "document": pdf_path.name,
-                            "page_number": page_num,
-                            "section_title": line_clean,
-                            "text": line_clean
-                        })
-        print(f"  Found {len(sections)} sections")
+                    if len(line_clean) >= MIN_SECTION_LENGTH and line_clean[0].isupper():
+                        documents.append(document)
+                        page_numbers.append(page_num)
+                        texts.append(line_clean)
+        # Workers are reused across batches, so drop MuPDF's cached fonts and images
+        # (and its message list) instead of letting them pile up between documents
+        pymupdf.TOOLS.store_shrink(100)
+        pymupdf.TOOLS.reset_mupdf_warnings()
+        print(f"  Found {len(texts)} sections")
         return sections
     except Exception as e:
         print(f"  Error extracting from {pdf_path}: {e}")
-        return []
+        return None
 
 # Step 2: Rank relevance using TF-IDF
-def rank_sections(sections, persona, job):
-    if not sections:
+def fit_shared_vectorizer(collections):
+    """Fit one TF-IDF weighting over the queries and sections of all collections."""
+    corpus = []
+    for collection in collections:
+        corpus.append(f"{collection['persona']}. {collection['job']}")
+        corpus.extend(collection["sections"]["texts"])
+    if not corpus:
+        return None
+    return make_vectorizer().fit(corpus)
+
+def query_vector(vectorizer, query):
+    """Dense float32 TF-IDF vector of a query."""
+    return vectorizer.transform([query]).toarray().ravel()
+
+@lru_cache(maxsize=64)
+def shared_query_vector(vectorizer, persona, job):
+    """Query vector against the shared vectorizer; repeated queries are transformed once."""
+    return query_vector(vectorizer, f"{persona}. {job}")
+
+def rank_sections(sections, persona, job, vectorizer=None):
+    """Return the indices of the top-ranked sections, best first."""
+    texts = sections["texts"]
+    if not texts:
         print("  No sections to rank")
         return []
     
-    print(f"  Ranking {len(sections)} sections for persona: '{persona}', job: '{job}'")
+    print(f"  Ranking {len(texts)} sections for persona: '{persona}', job: '{job}'")
     try:
         query = f"{persona}. {job}"
-        corpus = [query] + [s["text"] for s in sections]
-        tfidf = TfidfVectorizer().fit_transform(corpus)
-        scores = cosine_similarity(tfidf[0:1], tfidf[1:]).flatten()
-        for idx, score in enumerate(scores):
-            sections[idx]["score"] = float(score)
-        ranked = sorted(sections, key=lambda x: -x["score"])
-        print(f"  Top score: {ranked[0]['score']:.4f}" if ranked else "  No ranked results")
-        return ranked
+        if vectorizer is None:
+            # A local fit is never reused, so its query vector stays out of the cache
+            vectorizer = make_vectorizer().fit([query] + texts)
+            query_vec = query_vector(vectorizer, query)
+        else:
+            query_vec = shared_query_vector(vectorizer, persona, job)
+        # Repeated lines (running headers, footers) are vectorized and scored once,
+        # then scores are scattered back to every occurrence
+        unique_index = {}
+        inverse = np.fromiter((unique_index.setdefault(t, len(unique_index)) for t in texts),
+                              dtype=np.intp, count=len(texts))
+        section_vecs = vectorizer.transform(list(unique_index))
+        section_vecs.sort_indices()
+        # TF-IDF rows are L2-normalized (norm='l2'), so cosine is the dot product;
+        # a dense query turns it into one sparse-matrix x dense-vector product
+        scores = section_vecs.dot(query_vec)[inverse]
+        # Partial selection of the top-k; every section tied with the k-th score is
+        # kept as a candidate so the stable sort breaks ties like a full sort would
+        k = min(TOP_K, len(scores))
+        threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= threshold)
+        top = candidates[np.argsort(-scores[candidates], kind="stable")][:k]
+        print(f"  Top score: {scores[top[0]]:.4f}")
+        return top.tolist()
     except Exception as e:
         print(f"  Error in ranking: {e}")
-        return sections
+        return list(range(min(TOP_K, len(texts))))
 
 # Step 3: Build output JSON
-def build_output_json(sections, input_data):
+def build_output_json(sections, ranked, input_data, filenames):
     output = {
         "metadata": {
-            "input_documents": [d["filename"] for d in input_data.get("documents", [])],
+            "input_documents": filenames,
             "persona": input_data.get("persona", {}).get("role", ""),
             "job_to_be_done": input_data.get("job_to_be_done", {}).get("task", ""),
             "processing_timestamp": datetime.now().isoformat()
@@ -99,22 +247,24 @@ def build_output_json(sections, input_data):
         "subsection_analysis": []
     }
 
-    for rank, sec in enumerate(sections[:5], start=1):
+    for rank, idx in enumerate(ranked[:TOP_K], start=1):
         output["extracted_sections"].append({
-            "document": sec["document"],
-            "page_number": sec["page_number"],
-            "section_title": sec["section_title"],
+            "document": sections["documents"][idx],
+            "page_number": sections["page_numbers"][idx],
+            "section_title": sections["texts"][idx],
             "importance_rank": rank
         })
         output["subsection_analysis"].append({
-            "document": sec["document"],
-            "page_number": sec["page_number"],
-            "refined_text": sec["text"]
+            "document": sections["documents"][idx],
+            "page_number": sections["page_numbers"][idx],
+            "refined_text": sections["texts"][idx]
         })
     return output
 
 # Step 4: Process each collection folder
 def process_collections():
+    # Every collection is extracted first, so one TF-IDF fit can serve all of them
+    collections = []
     print(f"Looking for collections in: {BASE_DIR}")
     
     if not BASE_DIR.exists():
@@ -136,6 +286,7 @@ def process_collections():
         input_path = collection_dir / "challenge1b_input.json"
         pdf_dir = collection_dir / "PDFs"
         output_path = collection_dir / "challenge1b_output.json"
+        cache_dir = collection_dir / SECTION_CACHE_SUBDIR
 
         print(f"Input file: {input_path} (exists: {input_path.exists()})")
         print(f"PDF directory: {pdf_dir} (exists: {pdf_dir.exists()})")
@@ -145,8 +296,8 @@ def process_collections():
             continue
 
         try:
-            with open(input_path, "r") as f:
-                input_data = json.load(f)
+            with open(input_path, "rb") as f:
+                input_data = load_json(f.read())
             print(f"Loaded input data successfully")
         except Exception as e:
             print(f"Error loading input file: {e}")
@@ -156,22 +307,76 @@ def process_collections():
         job = input_data.get("job_to_be_done", {}).get("task", "")
         print(f"Persona: '{persona}', Job: '{job}'")
 
-        all_sections = []
+        pdf_paths = []
         for doc in input_data.get("documents", []):
             pdf_file = pdf_dir / doc["filename"]
             if not pdf_file.exists():
                 print(f"Warning: {pdf_file.name} not found. Skipping.")
                 continue
-            sections = extract_outline_and_paragraphs(pdf_file)
-            all_sections.extend(sections)
+            pdf_paths.append(pdf_file)
+
+        # A PDF listed twice is looked up, extracted and cached once; the final
+        # assembly below still walks pdf_paths, so its sections repeat as before
+        pdf_sections = {}
+        changed_paths = []
+        unique_paths = list(dict.fromkeys(pdf_paths))
+        for pdf_path in unique_paths:
+            cached = load_cached_sections(cache_dir, pdf_path)
+            if cached is None:
+                changed_paths.append(pdf_path)
+            else:
+                pdf_sections[pdf_path] = cached
+        print(f"Cached PDFs: {len(pdf_sections)}, to extract: {len(changed_paths)}")
+
+        # Pages are independent, so extract page batches of every changed PDF in parallel;
+        # map() keeps results in document and page order
+        tasks = split_page_ranges(changed_paths)
+        if tasks:
+            failed = set()
+            with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, len(tasks))) as executor:
+                results = executor.map(extract_outline_and_paragraphs, *zip(*tasks))
+                for (pdf_path, _, _), batch in zip(tasks, results):
+                    if batch is None:
+                        failed.add(pdf_path)
+                        continue
+                    merged = pdf_sections.setdefault(pdf_path, empty_sections())
+                    for key, values in batch.items():
+                        merged[key].extend(values)
+            for pdf_path in changed_paths:
+                if pdf_path in pdf_sections and pdf_path not in failed:
+                    save_cached_sections(cache_dir, pdf_path, pdf_sections[pdf_path])
+        prune_section_cache(cache_dir, unique_paths)
+
+        all_sections = empty_sections()
+        for pdf_path in pdf_paths:
+            for key, values in pdf_sections.get(pdf_path, {}).items():
+                all_sections[key].extend(values)
+
+        print(f"Total sections extracted: {len(all_sections['texts'])}")
+        collections.append({
+            "name": collection_dir.name,
+            "input_data": input_data,
+            "persona": persona,
+            "job": job,
+            "sections": all_sections,
+            "output_path": output_path
+        })
+
+    vectorizer = fit_shared_vectorizer(collections)
 
-        print(f"Total sections extracted: {len(all_sections)}")
+    for collection in collections:
+        print(f"\n--- Ranking collection: {collection['name']} ---")
+        input_data = collection["input_data"]
+        persona, job = collection["persona"], collection["job"]
+        all_sections = collection["sections"]
+        output_path = collection["output_path"]
+        filenames = [d["filename"] for d in input_data.get("documents", [])]
 
-        if not all_sections:
+        if not all_sections["texts"]:
             print("No sections found, creating minimal output")
             result = {
                 "metadata": {
-                    "input_documents": [d["filename"] for d in input_data.get("documents", [])],
+                    "input_documents": filenames,
                     "persona": persona,
                     "job_to_be_done": job
                 },
@@ -179,12 +384,12 @@ def process_collections():
                 "subsection_analysis": []
             }
         else:
-            ranked = rank_sections(all_sections, persona, job)
-            result = build_output_json(ranked, input_data)
+            ranked = rank_sections(all_sections, persona, job, vectorizer)
+            result = build_output_json(all_sections, ranked, input_data, filenames)
 
         try:
-            with open(output_path, "w") as f:
-                json.dump(result, f, indent=2)
+            with open(output_path, "wb") as f:
+                f.write(dump_json(result))
             print(f"✓ Output written to: {output_path}")
         except Exception as e:
             print(f"Error writing output: {e}")
@@ -192,6 +397,7 @@ def process_collections():
 if __name__ == "__main__":
     print("Starting process_persona.py...")
     try:
+        ensure_sklearn()
         process_collections()
         print("Processing completed!")
     except Exception as e: